@@ -3,8 +3,9 @@
 # dependencies = [
 #     "typer>=0.15",
 #     "rich>=13",
-#     "httpx>=0.27",
+#     "httpx[http2]>=0.27",
 #     "jinja2>=3",
+#     "orjson>=3",
 #     "python-dotenv>=1",
 # ]
 # ///
@@ -13,19 +14,24 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import ipaddress
-import json
+import os
 import re
+import sys
 from pathlib import Path
-from typing import Annotated, Optional
+from typing import TYPE_CHECKING, Annotated, Any, Optional
 
 import httpx
 import typer
 from dotenv import load_dotenv
-import jinja2
-from jinja2 import Environment, FileSystemLoader, TemplateError
+import orjson
 from rich.console import Console
 
+if TYPE_CHECKING:
+    import jinja2
+
 load_dotenv()
 
 app = typer.Typer(
@@ -34,199 +40,361 @@ app = typer.Typer(
     add_completion=False,
 )
 
-err_console = Console(stderr=True)
+# Simple style tags used in our messages, e.g. "[red]" / "[/red]"
+_MARKUP_RE = re.compile(r"\[/?[a-z]+\]")
+
+
+class _PlainConsole:
+    """Minimal stand-in for rich's Console writing unstyled text to stderr."""
+
+    def print(self, message: str) -> None:
+        sys.stderr.write(_MARKUP_RE.sub("", message) + "\n")
+
+
+# Rich styling is pointless when stderr is piped or captured (CI, logs)
+err_console = Console(stderr=True) if sys.stderr.isatty() else _PlainConsole()
+
+# Any character that is not an ASCII letter or digit becomes "_"
+_SANITIZE_RE = re.compile(r"[^a-zA-Z0-9]")
+_SANITIZE_TABLE = str.maketrans(
+    {chr(c): "_" for c in range(128) if not chr(c).isalnum()}
+)
+
+
+# zpod fields copied into the template context as-is (None when missing)
+_ZPOD_KEYS = (
+    "id",
+    "name",
+    "description",
+    "domain",
+    "password",
+    "profile",
+    "status",
+    "creation_date",
+    "last_modified_date",
+    "endpoint",
+    "features",
+)
+
+
+# Template variables derived from the zPodFactory settings
+_SETTINGS_VARS = frozenset({"zpod_settings", "zpod_ntp", "zpod_sshkey"})
+
+# Shared read-only default for missing nested objects (never mutate)
+_EMPTY: dict = {}
 
 
 def _sanitize_component_name(name: str) -> str:
     """Convert a component name to a valid Python identifier for template use."""
-    return re.sub(r"[^a-zA-Z0-9]", "_", name).strip("_").lower()
+    if name.isascii():
+        sanitized = name.translate(_SANITIZE_TABLE)
+    else:
+        sanitized = _SANITIZE_RE.sub("_", name)
+    return sanitized.strip("_").lower()
+
+
+def _new_client(host: str, token: str) -> httpx.AsyncClient:
+    """Create the pooled HTTP/2 client shared by all zpodapi requests of a run."""
+    return httpx.AsyncClient(
+        base_url=host.rstrip("/"),
+        headers={"access_token": token},
+        http2=True,
+        timeout=30,
+        limits=httpx.Limits(max_keepalive_connections=8),
+    )
 
 
-def _fetch_zpod(host: str, token: str, zpod_name: str) -> dict:
-    """Fetch zpod details by name from the zpodapi."""
-    url = f"{host.rstrip('/')}/zpods/name={zpod_name}"
-    headers = {"access_token": token}
+async def _http_get(
+    client: httpx.AsyncClient,
+    path: str,
+    *,
+    warn_only: str | None = None,
+    not_found: str | None = None,
+) -> Any:
+    """GET a zpodapi path and return its decoded JSON body.
 
+    Failures abort the run, unless ``warn_only`` names what is being fetched:
+    a warning is then printed and an empty list returned. ``not_found`` is
+    the error shown on a 404 instead of the generic status error.
+    """
     try:
-        response = httpx.get(url, headers=headers, timeout=30)
-    except httpx.ConnectError:
-        err_console.print(f"[red]Error:[/red] Cannot connect to zpodapi at {host}")
-        raise typer.Exit(code=1)
+        response = await client.get(path)
     except httpx.RequestError as exc:
-        err_console.print(f"[red]Error:[/red] Request failed: {exc}")
+        if warn_only:
+            err_console.print(f"[yellow]Warning:[/yellow] Failed to fetch {warn_only}: {exc}")
+            return []
+        if isinstance(exc, httpx.ConnectError):
+            err_console.print(f"[red]Error:[/red] Cannot connect to zpodapi at {client.base_url}")
+        else:
+            err_console.print(f"[red]Error:[/red] Request failed: {exc}")
         raise typer.Exit(code=1)
 
+    if response.status_code == 200:
+        return orjson.loads(response.content)
+
+    if warn_only:
+        err_console.print(
+            f"[yellow]Warning:[/yellow] Could not fetch {warn_only} (status {response.status_code})"
+        )
+        return []
     if response.status_code == 401:
         err_console.print("[red]Error:[/red] Authentication failed. Check your API token.")
-        raise typer.Exit(code=1)
-    if response.status_code == 404:
-        err_console.print(f"[red]Error:[/red] zPod '{zpod_name}' not found.")
-        raise typer.Exit(code=1)
-    if response.status_code != 200:
+    elif response.status_code == 404 and not_found:
+        err_console.print(f"[red]Error:[/red] {not_found}")
+    else:
         err_console.print(
             f"[red]Error:[/red] API returned status {response.status_code}: {response.text}"
         )
-        raise typer.Exit(code=1)
+    raise typer.Exit(code=1)
+
 
-    return response.json()
+async def _fetch_zpod(client: httpx.AsyncClient, zpod_name: str) -> dict:
+    """Fetch zpod details by name from the zpodapi."""
+    return await _http_get(
+        client, f"/zpods/name={zpod_name}", not_found=f"zPod '{zpod_name}' not found."
+    )
 
 
-def _fetch_zpods(host: str, token: str) -> list[dict]:
+async def _fetch_zpods(client: httpx.AsyncClient) -> list[dict]:
     """Fetch all zpods from the zpodapi."""
-    url = f"{host.rstrip('/')}/zpods"
-    headers = {"access_token": token}
+    return await _http_get(client, "/zpods")
 
-    try:
-        response = httpx.get(url, headers=headers, timeout=30)
-    except httpx.ConnectError:
-        err_console.print(f"[red]Error:[/red] Cannot connect to zpodapi at {host}")
-        raise typer.Exit(code=1)
-    except httpx.RequestError as exc:
-        err_console.print(f"[red]Error:[/red] Request failed: {exc}")
-        raise typer.Exit(code=1)
 
-    if response.status_code == 401:
-        err_console.print("[red]Error:[/red] Authentication failed. Check your API token.")
-        raise typer.Exit(code=1)
-    if response.status_code != 200:
-        err_console.print(
-            f"[red]Error:[/red] API returned status {response.status_code}: {response.text}"
+async def _fetch_zpod_dns_records(client: httpx.AsyncClient, zpod_id: int) -> list[dict]:
+    """Fetch DNS entries for a zpod."""
+    return await _http_get(client, f"/zpods/{zpod_id}/dns", warn_only="DNS entries")
+
+
+async def _fetch_settings(client: httpx.AsyncClient) -> list[dict]:
+    """Fetch all zPodFactory settings."""
+    return await _http_get(client, "/settings", warn_only="settings")
+
+
+async def _list_zpods(host: str, token: str) -> list[dict]:
+    """Fetch all zpods using a dedicated client."""
+    async with _new_client(host, token) as client:
+        return await _fetch_zpods(client)
+
+
+async def _no_records() -> list[dict]:
+    """Stand-in for a fetch that the template does not need."""
+    return []
+
+
+async def _fetch_zpod_data(
+    host: str,
+    token: str,
+    zpod_name: str,
+    *,
+    fetch_dns: bool = True,
+    fetch_settings: bool = True,
+) -> tuple[dict, list[dict], list[dict]]:
+    """Fetch the zpod, its DNS entries and the settings, overlapping requests.
+
+    The zpod and the settings are independent and fetched concurrently; the
+    DNS entries need the zpod id so they are fetched once the zpod is known.
+    All requests share one pooled client so the connection is reused. DNS
+    entries and settings are left empty when not requested.
+    """
+    async with _new_client(host, token) as client:
+        err_console.print(f"Fetching zPod '[bold]{zpod_name}[/bold]' from {host}...")
+        if fetch_settings:
+            err_console.print("Fetching zPodFactory settings...")
+        settings_task = asyncio.ensure_future(
+            _fetch_settings(client) if fetch_settings else _no_records()
+        )
+        try:
+            zpod = await _fetch_zpod(client, zpod_name)
+        except BaseException:
+            settings_task.cancel()
+            raise
+
+        zpod_id = zpod.get("id")
+        if fetch_dns:
+            err_console.print(f"Fetching DNS entries for zPod id={zpod_id}...")
+        zpod_dns_records, settings = await asyncio.gather(
+            _fetch_zpod_dns_records(client, zpod_id) if fetch_dns else _no_records(),
+            settings_task,
         )
-        raise typer.Exit(code=1)
 
-    return response.json()
+    return zpod, zpod_dns_records, settings
 
 
-def _fetch_zpod_dns_records(host: str, token: str, zpod_id: int) -> list[dict]:
-    """Fetch DNS entries for a zpod."""
-    url = f"{host.rstrip('/')}/zpods/{zpod_id}/dns"
-    headers = {"access_token": token}
+def _template_references(
+    env: jinja2.Environment, name: str, source: str, filename: str | None
+) -> tuple[list[str], list[str | None]]:
+    """Return the undeclared variables and referenced templates of one template.
 
-    try:
-        response = httpx.get(url, headers=headers, timeout=30)
-    except httpx.RequestError as exc:
-        err_console.print(f"[yellow]Warning:[/yellow] Failed to fetch DNS entries: {exc}")
-        return []
+    The result is stored next to the compiled bytecode, keyed by template name
+    and source, so warm runs never parse. On a miss the single parse is also
+    compiled into the bytecode cache, so get_template() does not parse again.
+    """
+    from jinja2 import meta
 
-    if response.status_code != 200:
-        err_console.print(
-            f"[yellow]Warning:[/yellow] Could not fetch DNS entries (status {response.status_code})"
-        )
-        return []
+    bytecode_cache = env.bytecode_cache
+    directory = getattr(bytecode_cache, "directory", None)
+    cache_file = None
+    if directory:
+        key = hashlib.sha1(f"{name}|{source}".encode("utf-8")).hexdigest()
+        cache_file = Path(directory) / f"__zpod_vars_{key}.json"
+        try:
+            cached = orjson.loads(cache_file.read_bytes())
+            return cached["names"], cached["refs"]
+        except (OSError, orjson.JSONDecodeError, KeyError, TypeError):
+            pass
 
-    return response.json()
+    ast = env.parse(source, name, filename)
+    names = sorted(meta.find_undeclared_variables(ast))
+    refs = list(meta.find_referenced_templates(ast))
 
+    if bytecode_cache is not None:
+        bucket = bytecode_cache.get_bucket(env, name, filename, source)
+        if bucket.code is None:
+            bucket.code = env.compile(ast, name, filename)
+            bytecode_cache.set_bucket(bucket)
+    if cache_file is not None:
+        try:
+            cache_file.write_bytes(orjson.dumps({"names": names, "refs": refs}))
+        except OSError:
+            pass
 
-def _fetch_settings(host: str, token: str) -> list[dict]:
-    """Fetch all zPodFactory settings."""
-    url = f"{host.rstrip('/')}/settings"
-    headers = {"access_token": token}
+    return names, refs
 
-    try:
-        response = httpx.get(url, headers=headers, timeout=30)
-    except httpx.RequestError as exc:
-        err_console.print(f"[yellow]Warning:[/yellow] Failed to fetch settings: {exc}")
-        return []
 
-    if response.status_code != 200:
-        err_console.print(
-            f"[yellow]Warning:[/yellow] Could not fetch settings (status {response.status_code})"
-        )
-        return []
+def _referenced_variables(env: jinja2.Environment, template_name: str) -> set[str] | None:
+    """Return the context variables a template (and what it includes) reads.
 
-    return response.json()
+    Returns None when that cannot be determined statically: no source access
+    (precompiled templates), a dynamic include/extends, or a template error.
+    """
+    from jinja2 import TemplateError
+
+    if env.loader is None or not env.loader.has_source_access:
+        return None
+
+    names: set[str] = set()
+    seen: set[str] = set()
+    pending = [template_name]
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        try:
+            source, filename, _ = env.loader.get_source(env, name)
+            template_names, refs = _template_references(env, name, source, filename)
+        except (OSError, TemplateError):
+            # get_template() reports the actual error
+            return None
+        names.update(template_names)
+        for ref in refs:
+            if ref is None:
+                return None
+            pending.append(ref)
+    return names
 
 
 def _build_template_context(zpod: dict, zpod_dns_records: list[dict], settings: list[dict], extra_vars: dict | None) -> dict:
     """Build the template context dict from zpod data and extra variables."""
-    context = {
-        # Root zpod fields
-        "zpod_id": zpod.get("id"),
-        "zpod_name": zpod.get("name"),
-        "zpod_description": zpod.get("description"),
-        "zpod_domain": zpod.get("domain"),
-        "zpod_password": zpod.get("password"),
-        "zpod_profile": zpod.get("profile"),
-        "zpod_status": zpod.get("status"),
-        "zpod_creation_date": zpod.get("creation_date"),
-        "zpod_last_modified_date": zpod.get("last_modified_date"),
-        # Full objects for iteration
-        "zpod_components": zpod.get("components", []),
-        "zpod_networks": zpod.get("networks", []),
-        "zpod_dns_records": zpod_dns_records,
-        "zpod_endpoint": zpod.get("endpoint"),
-        "zpod_features": zpod.get("features"),
-        "zpod_permissions": zpod.get("permissions", []),
-        # Settings
-        "zpod_settings": settings,
-    }
+    # Each group is built as its own dict and merged once at the end, so the
+    # final table grows in a few pre-sized merges instead of key by key.
 
     # Convenience: individual settings by name -> value
-    settings_by_name = {}
-    for setting in settings:
-        setting_name = setting.get("name", "")
-        if setting_name:
-            key = f"zpod_setting_{_sanitize_component_name(setting_name)}"
-            context[key] = setting.get("value")
-            settings_by_name[setting_name] = setting.get("value")
+    settings_by_name = {s["name"]: s.get("value") for s in settings if s.get("name")}
+    setting_vars = {
+        f"zpod_setting_{_sanitize_component_name(k)}": v for k, v in settings_by_name.items()
+    }
 
     # Computed network values from the first (management) network
+    network_vars = {}
     networks = zpod.get("networks", [])
     if networks:
         try:
             mgmt_network = ipaddress.ip_network(networks[0].get("cidr", ""), strict=False)
             # Gateway is the first usable host (.1) in the management network
-            network_addr = str(mgmt_network.network_address)
-            context["zpod_subnet"] = network_addr.rsplit(".", 1)[0]
-            context["zpod_gateway"] = str(mgmt_network.network_address + 1)
-            context["zpod_netmask"] = str(mgmt_network.netmask)
-            context["zpod_netprefix"] = mgmt_network.prefixlen
+            if mgmt_network.version == 4:
+                # Work on the integer form to avoid intermediate address objects
+                net_int = int(mgmt_network.network_address)
+                octets = net_int.to_bytes(4, "big")
+                network_vars["zpod_subnet"] = f"{octets[0]}.{octets[1]}.{octets[2]}"
+                network_vars["zpod_gateway"] = str(ipaddress.IPv4Address(net_int + 1))
+            else:
+                network_addr = mgmt_network.network_address
+                network_vars["zpod_subnet"] = str(network_addr).rsplit(".", 1)[0]
+                network_vars["zpod_gateway"] = str(network_addr + 1)
+            network_vars["zpod_netmask"] = str(mgmt_network.netmask)
+            network_vars["zpod_netprefix"] = mgmt_network.prefixlen
         except ValueError:
             pass
 
     # Convenience: individual components by name
+    components = zpod.get("components", [])
+    component_vars = {}
     zbox_ip = None
-    for comp in zpod.get("components", []):
-        comp_info = comp.get("component", {})
-        comp_name = comp_info.get("component_name", "")
-        if comp_name:
-            key = f"zpod_component_{_sanitize_component_name(comp_name)}"
-            context[key] = comp
-            if comp_name == "zbox":
-                zbox_ip = comp.get("ip")
-
-    # Computed infrastructure values
-    context["zpod_portgroup"] = f"zpod-{zpod['name']}-segment"
-    context["zpod_dns"] = zbox_ip
-    context["zpod_nfs"] = zbox_ip
-    context["zpod_ntp"] = settings_by_name.get("zpodfactory_host")
-    context["zpod_sshkey"] = settings_by_name.get("zpodfactory_ssh_key")
+    for comp in components:
+        comp_name = (comp.get("component") or _EMPTY).get("component_name")
+        if not comp_name:
+            continue
+        component_vars[f"zpod_component_{_sanitize_component_name(comp_name)}"] = comp
+        if comp_name == "zbox":
+            zbox_ip = comp.get("ip")
+
+    return {
+        # Root zpod fields and single objects, exposed as zpod_<key>
+        **{f"zpod_{key}": zpod.get(key) for key in _ZPOD_KEYS},
+        # Full objects for iteration
+        "zpod_components": components,
+        "zpod_networks": networks,
+        "zpod_dns_records": zpod_dns_records,
+        "zpod_permissions": zpod.get("permissions", []),
+        # Settings
+        "zpod_settings": settings,
+        **setting_vars,
+        **network_vars,
+        **component_vars,
+        # Computed infrastructure values
+        "zpod_portgroup": f"zpod-{zpod['name']}-segment",
+        "zpod_dns": zbox_ip,
+        "zpod_nfs": zbox_ip,
+        "zpod_ntp": settings_by_name.get("zpodfactory_host"),
+        "zpod_sshkey": settings_by_name.get("zpodfactory_ssh_key"),
+        # Extra variables from JSON file (keys used as-is, no prefix)
+        **(extra_vars or _EMPTY),
+    }
 
-    # Extra variables from JSON file (keys used as-is, no prefix)
-    if extra_vars:
-        context.update(extra_vars)
 
-    return context
+def _require_api_access(host: str | None, token: str | None) -> None:
+    """Exit with an error unless both zpodapi connection settings are set."""
+    if not host:
+        err_console.print(
+            "[red]Error:[/red] --zpodfactory-host (or ZPODFACTORY_HOST) is required."
+        )
+        raise typer.Exit(code=1)
+    if not token:
+        err_console.print(
+            "[red]Error:[/red] --zpodfactory-token (or ZPODFACTORY_TOKEN) is required."
+        )
+        raise typer.Exit(code=1)
 
 
 @app.command()
 def generate(
     zpodfactory_host: Annotated[
-        str,
+        Optional[str],
         typer.Option(
             "--zpodfactory-host",
             envvar="ZPODFACTORY_HOST",
-            help="zpodapi host URL (e.g. http://zpodfactory.fqdn.com:8000)",
+            help="zpodapi host URL (e.g. http://zpodfactory.fqdn.com:8000), required except with --precompile",
         ),
-    ],
+    ] = None,
     zpodfactory_token: Annotated[
-        str,
+        Optional[str],
         typer.Option(
             "--zpodfactory-token",
             envvar="ZPODFACTORY_TOKEN",
-            help="zpodapi access token",
+            help="zpodapi access token, required except with --precompile",
         ),
-    ],
+    ] = None,
     list_zpods: Annotated[
         bool,
         typer.Option(
@@ -270,17 +438,96 @@ def generate(
             help="Write rendered output to file instead of stdout",
         ),
     ] = None,
+    jinja_cache_dir: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--jinja-cache-dir",
+            help="Directory for compiled template bytecode (defaults to a private per-user temp dir)",
+            file_okay=False,
+            dir_okay=True,
+        ),
+    ] = None,
+    precompiled_dir: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--precompiled-dir",
+            help="Load templates precompiled with --precompile from this directory",
+            file_okay=False,
+            dir_okay=True,
+        ),
+    ] = None,
+    precompile: Annotated[
+        bool,
+        typer.Option(
+            "--precompile",
+            help="Compile the templates next to --template-file into --precompiled-dir and exit",
+        ),
+    ] = False,
 ) -> None:
     """Fetch zPod metadata and render a Jinja2 template."""
     # List zpods mode
     if list_zpods:
-        zpods = _fetch_zpods(zpodfactory_host, zpodfactory_token)
+        _require_api_access(zpodfactory_host, zpodfactory_token)
+        zpods = asyncio.run(_list_zpods(zpodfactory_host, zpodfactory_token))
         err_console.print("Available zPods:")
         for z in zpods:
             err_console.print(f"  - {z.get('name', '')}")
         raise typer.Exit()
 
+    # jinja2 is imported here so --help and --list-zpods skip it
+    import jinja2
+    from jinja2 import (
+        Environment,
+        FileSystemBytecodeCache,
+        FileSystemLoader,
+        ModuleLoader,
+        TemplateError,
+        TemplateSyntaxError,
+    )
+
+    # Shared by every Environment below; the lexer options must match between
+    # precompiling and rendering. A one-shot render never needs to re-stat the
+    # template (auto_reload) or evict it from the cache.
+    env_options = {
+        "keep_trailing_newline": True,
+        "undefined": jinja2.Undefined,
+        "auto_reload": False,
+        "cache_size": -1,
+    }
+
+    # Precompile mode
+    if precompile:
+        if not template_file:
+            err_console.print("[red]Error:[/red] --template-file is required for precompilation.")
+            raise typer.Exit(code=1)
+        if not precompiled_dir:
+            err_console.print("[red]Error:[/red] --precompiled-dir is required for precompilation.")
+            raise typer.Exit(code=1)
+        env = Environment(loader=FileSystemLoader(str(template_file.parent)), **env_options)
+        # Only files sharing the template's suffix, so stray files are left alone
+        suffix = template_file.suffix
+        try:
+            env.compile_templates(
+                str(precompiled_dir),
+                zip=None,
+                filter_func=lambda name: Path(name).suffix == suffix,
+                ignore_errors=False,
+            )
+        except TemplateSyntaxError as exc:
+            err_console.print(
+                f"[red]Error:[/red] Template precompilation failed: {exc.name}, line {exc.lineno}: {exc.message}"
+            )
+            raise typer.Exit(code=1)
+        except (OSError, TemplateError) as exc:
+            err_console.print(f"[red]Error:[/red] Template precompilation failed: {exc}")
+            raise typer.Exit(code=1)
+        err_console.print(
+            f"[green]Templates from {template_file.parent} compiled to {precompiled_dir}[/green]"
+        )
+        raise typer.Exit()
+
     # Validate required options for generate mode
+    _require_api_access(zpodfactory_host, zpodfactory_token)
     if not zpod_name:
         err_console.print("[red]Error:[/red] --zpod-name is required for template generation.")
         raise typer.Exit(code=1)
@@ -292,48 +539,76 @@ def generate(
     extra_vars = None
     if template_extra_vars:
         try:
-            extra_vars = json.loads(template_extra_vars.read_text())
-        except json.JSONDecodeError as exc:
+            extra_vars = orjson.loads(template_extra_vars.read_bytes())
+        except orjson.JSONDecodeError as exc:
             err_console.print(
                 f"[red]Error:[/red] Invalid JSON in extra vars file: {exc}"
             )
             raise typer.Exit(code=1)
-        if not isinstance(extra_vars, dict):
+        # orjson only ever produces exact dicts, so an identity check suffices
+        if type(extra_vars) is not dict:
             err_console.print(
                 "[red]Error:[/red] Extra vars JSON must be an object (dict), "
                 f"got {type(extra_vars).__name__}"
             )
             raise typer.Exit(code=1)
 
-    # Fetch zpod data
-    err_console.print(f"Fetching zPod '[bold]{zpod_name}[/bold]' from {zpodfactory_host}...")
-    zpod = _fetch_zpod(zpodfactory_host, zpodfactory_token, zpod_name)
-
-    zpod_id = zpod.get("id")
-    err_console.print(f"Fetching DNS entries for zPod id={zpod_id}...")
-    zpod_dns_records = _fetch_zpod_dns_records(zpodfactory_host, zpodfactory_token, zpod_id)
-
-    err_console.print("Fetching zPodFactory settings...")
-    settings = _fetch_settings(zpodfactory_host, zpodfactory_token)
-
-    # Build template context
-    context = _build_template_context(zpod, zpod_dns_records, settings, extra_vars)
-
-    # Render template
-    template_dir = str(template_file.parent.resolve())
+    # Load template
     template_name = template_file.name
-    env = Environment(
-        loader=FileSystemLoader(template_dir),
-        keep_trailing_newline=True,
-        undefined=jinja2.Undefined,
-    )
+    if precompiled_dir:
+        # Precompiled modules skip lexing, parsing and compiling entirely
+        env = Environment(loader=ModuleLoader(str(precompiled_dir)), **env_options)
+    else:
+        # Keep the loader (for include/extends) but skip the realpath traversal
+        template_dir = str(template_file.parent)
+        try:
+            if jinja_cache_dir:
+                jinja_cache_dir.mkdir(parents=True, exist_ok=True)
+                if not os.access(jinja_cache_dir, os.W_OK | os.X_OK):
+                    raise PermissionError(f"{jinja_cache_dir} is not writable")
+                bytecode_cache = FileSystemBytecodeCache(str(jinja_cache_dir))
+            else:
+                # Jinja's per-user default dir, created 0700 with ownership checks
+                bytecode_cache = FileSystemBytecodeCache()
+        except (OSError, RuntimeError) as exc:
+            err_console.print(f"[red]Error:[/red] Cannot use Jinja cache directory: {exc}")
+            raise typer.Exit(code=1)
+        env = Environment(
+            loader=FileSystemLoader(template_dir),
+            bytecode_cache=bytecode_cache,
+            **env_options,
+        )
+
+    # Only fetch DNS entries and settings when the template can use them.
+    # Analysing first lets a cold run reuse the same parse for the bytecode.
+    used = _referenced_variables(env, template_name)
 
     try:
         template = env.get_template(template_name)
-    except TemplateError as exc:
+    except (OSError, TemplateError) as exc:
         err_console.print(f"[red]Error:[/red] Failed to load template: {exc}")
         raise typer.Exit(code=1)
 
+    fetch_dns = used is None or "zpod_dns_records" in used
+    fetch_settings = used is None or any(
+        name in _SETTINGS_VARS or name.startswith("zpod_setting_") for name in used
+    )
+
+    # Fetch zpod data
+    zpod, zpod_dns_records, settings = asyncio.run(
+        _fetch_zpod_data(
+            zpodfactory_host,
+            zpodfactory_token,
+            zpod_name,
+            fetch_dns=fetch_dns,
+            fetch_settings=fetch_settings,
+        )
+    )
+
+    # Build template context
+    context = _build_template_context(zpod, zpod_dns_records, settings, extra_vars)
+
+    # Render template
     try:
         rendered = template.render(**context)
     except TemplateError as exc:
@@ -342,10 +617,11 @@ def generate(
 
     # Output
     if output_file:
-        output_file.write_text(rendered)
+        output_file.write_bytes(rendered.encode("utf-8"))
         err_console.print(f"[green]Output written to {output_file}[/green]")
     else:
-        print(rendered)
+        # Single write on the binary stream (print() also appended a newline)
+        sys.stdout.buffer.write(rendered.encode("utf-8") + b"\n")
 
 
 if __name__ == "__main__":